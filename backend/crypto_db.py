@@ -16,7 +16,7 @@ class CryptoDatabase:
         """初始化数据库连接池"""
         self.pool_config = {
             'pool_name': 'crypto_pool',
-            'pool_size': 3,
+            'pool_size': int(os.getenv('DB_POOL_SIZE', 3)),
             'host': os.getenv('DB_HOST', 'localhost'),
             'user': os.getenv('DB_USER', 'crypto_user'),
             'password': os.getenv('DB_PASSWORD', 'crypto_pass_2024'),
@@ -137,8 +137,25 @@ class CryptoDatabase:
         return None
     
     def connect(self):
-        """建立数据库连接"""
+        """建立数据库连接（已有存活连接时直接复用，不重复向池借出）"""
         try:
+            if self.connection:
+                try:
+                    if self.connection.is_connected():
+                        self.connection.ping(reconnect=True, attempts=1, delay=0)
+                        if not self.cursor:
+                            self.cursor = self.connection.cursor(buffered=True)
+                        return True
+                except mysql.connector.Error:
+                    pass
+                # 连接已失效：先归还给池（或关闭）再重新借出，避免泄漏池槽位
+                try:
+                    self.connection.close()
+                except Exception:
+                    pass
+                self.connection = None
+                self.cursor = None
+
             self.connection = self.get_connection()
             if self.connection is None:
                 logger.error("无法获取数据库连接")
@@ -238,6 +255,52 @@ class CryptoDatabase:
         logger.error(f"查询执行失败，已重试 {max_retries} 次")
         return False
     
+    def _execute_many(self, query, rows):
+        """批量执行写入语句：单次executemany + 单次提交"""
+        if not rows:
+            return True
+
+        try:
+            # 检查连接状态
+            connection_valid = False
+            if self.connection:
+                try:
+                    connection_valid = self.connection.is_connected()
+                except:
+                    connection_valid = False
+
+            if not connection_valid:
+                if not self.connect():
+                    logger.error("批量写入失败：无法连接数据库")
+                    return False
+
+            self.cursor.executemany(query, rows)
+            self.connection.commit()
+            return True
+
+        except mysql.connector.Error as err:
+            logger.error(f"批量SQL执行错误: {err}")
+            if self.connection:
+                self.connection.rollback()
+            return False
+        except Exception as e:
+            logger.error(f"批量写入未知错误: {e}")
+            return False
+
+    def _fetch_all(self, query, params=None, connection=None):
+        """执行查询并返回全部结果；提供connection时使用池中连接，否则走共享连接"""
+        if connection:
+            try:
+                cursor = connection.cursor()
+                cursor.execute(query, params or ())
+                result = cursor.fetchall()
+                cursor.close()
+                return result
+            except Exception as e:
+                logger.error(f"使用连接池执行查询失败: {str(e)}")
+                return []
+        return self.execute_query(query, params, fetch=True)
+
     def clear_database(self):
         """清空数据库中的所有表"""
         try:
@@ -414,9 +477,51 @@ class CryptoDatabase:
         quote_volume = VALUES(quote_volume)
         """
         
-        return self.execute_query(query, (symbol, date, open_price, high_price, 
+        return self.execute_query(query, (symbol, date, open_price, high_price,
                                         low_price, close_price, volume, quote_volume))
-    
+
+    def insert_current_prices_batch(self, rows):
+        """批量插入当前价格数据
+
+        rows: (symbol, price, change_24h, timestamp) 元组列表
+        """
+        query = """
+        INSERT INTO current_prices (symbol, price, change_24h, timestamp)
+        VALUES (%s, %s, %s, %s)
+        """
+        return self._execute_many(query, rows)
+
+    def insert_historical_batch(self, timeframe, rows):
+        """批量插入历史数据：整个时间范围一次executemany、一次提交
+
+        rows: (symbol, date, open, high, low, close, volume, quote_volume) 元组列表
+        """
+        table_map = {
+            'minute': 'minute_data',
+            'hour': 'hour_data',
+            'day': 'day_data'
+        }
+
+        if timeframe not in table_map:
+            logger.error(f"不支持的时间范围: {timeframe}")
+            return False
+
+        table_name = table_map[timeframe]
+        query = f"""
+        INSERT INTO {table_name}
+        (symbol, date, open_price, high_price, low_price, close_price, volume, quote_volume)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+        open_price = VALUES(open_price),
+        high_price = VALUES(high_price),
+        low_price = VALUES(low_price),
+        close_price = VALUES(close_price),
+        volume = VALUES(volume),
+        quote_volume = VALUES(quote_volume)
+        """
+
+        return self._execute_many(query, rows)
+
     def get_latest_prices(self, connection=None):
         """获取最新价格数据"""
         query = """
@@ -428,21 +533,8 @@ class CryptoDatabase:
         )
         ORDER BY cp.timestamp DESC
         """
-        
-        if connection:
-            # 使用传入的连接
-            try:
-                cursor = connection.cursor()
-                cursor.execute(query)
-                result = cursor.fetchall()
-                cursor.close()
-                return result
-            except Exception as e:
-                logger.error(f"使用连接池执行查询失败: {str(e)}")
-                return []
-        else:
-            # 使用原有的execute_query方法（向后兼容）
-            return self.execute_query(query, fetch=True)
+
+        return self._fetch_all(query, connection=connection)
     
     def get_historical_data(self, timeframe, symbol=None, limit=100, connection=None):
         """获取历史数据"""
@@ -474,23 +566,30 @@ class CryptoDatabase:
             LIMIT %s
             """
             params = (limit,)
-        
-        if connection:
-            # 使用传入的连接
-            try:
-                cursor = connection.cursor()
-                cursor.execute(query, params)
-                result = cursor.fetchall()
-                cursor.close()
-                return result
-            except Exception as e:
-                logger.error(f"使用连接池执行查询失败: {str(e)}")
-                return []
-        else:
-            # 使用原有的execute_query方法（向后兼容）
-            return self.execute_query(query, params, fetch=True)
+
+        return self._fetch_all(query, params, connection=connection)
     
-    def get_latest_price(self, symbol):
+    def get_historical_counts(self, connection=None):
+        """一次查询获取各时间范围的历史数据条数
+
+        之前统计数据量要分别拉取三张表各最多1000行再len()，
+        这里用UNION ALL把三个COUNT(*)合并成一次往返，只传回3个整数。
+        """
+        query = """
+        SELECT 'minute' AS timeframe, COUNT(*) AS cnt FROM minute_data
+        UNION ALL
+        SELECT 'hour', COUNT(*) FROM hour_data
+        UNION ALL
+        SELECT 'day', COUNT(*) FROM day_data
+        """
+        result = self._fetch_all(query, connection=connection)
+        counts = {'minute': 0, 'hour': 0, 'day': 0}
+        if result:
+            for timeframe, count in result:
+                counts[timeframe] = int(count)
+        return counts
+
+    def get_latest_price(self, symbol, connection=None):
         """获取单个加密货币的最新价格"""
         query = """
         SELECT ci.name, cp.symbol, cp.price, cp.change_24h, cp.timestamp
@@ -500,8 +599,8 @@ class CryptoDatabase:
         ORDER BY cp.timestamp DESC
         LIMIT 1
         """
-        
-        result = self.execute_query(query, (symbol,), fetch=True)
+
+        result = self._fetch_all(query, (symbol,), connection=connection)
         if result and len(result) > 0:
             row = result[0]
             # 使用统一的时间戳管理器处理时间戳
@@ -516,17 +615,17 @@ class CryptoDatabase:
             }
         return None
     
-    def get_chart_data(self, symbol, timeframe='hour'):
+    def get_chart_data(self, symbol, timeframe='hour', connection=None):
         """获取图表数据"""
         table_map = {
             'minute': 'minute_data',
             'hour': 'hour_data',
             'day': 'day_data'
         }
-        
+
         if timeframe not in table_map:
             return []
-        
+
         table_name = table_map[timeframe]
         query = f"""
         SELECT date, open_price, high_price, low_price, close_price, volume
@@ -535,8 +634,8 @@ class CryptoDatabase:
         ORDER BY date DESC
         LIMIT 100
         """
-        
-        result = self.execute_query(query, (symbol,), fetch=True)
+
+        result = self._fetch_all(query, (symbol,), connection=connection)
         if result:
             chart_data = []
             for row in result:
@@ -554,7 +653,7 @@ class CryptoDatabase:
             return chart_data
         return []
     
-    def get_price_history(self, symbol, timeframe='24h'):
+    def get_price_history(self, symbol, timeframe='24h', connection=None):
         """获取价格历史"""
         # 根据timeframe确定查询的表和时间范围
         if timeframe == '24h':
@@ -577,8 +676,8 @@ class CryptoDatabase:
         ORDER BY date DESC
         LIMIT %s
         """
-        
-        result = self.execute_query(query, (symbol, limit), fetch=True)
+
+        result = self._fetch_all(query, (symbol, limit), connection=connection)
         if result:
             history = []
             for row in result:
@@ -592,17 +691,24 @@ class CryptoDatabase:
             return history
         return []
     
-    def get_kline_data(self, symbol):
+    def get_kline_data(self, symbol, timeframe='hour', connection=None):
         """获取K线数据"""
-        query = """
+        table_map = {
+            'minute': 'minute_data',
+            'hour': 'hour_data',
+            'day': 'day_data'
+        }
+        table_name = table_map.get(timeframe, 'hour_data')
+
+        query = f"""
         SELECT date, open_price, high_price, low_price, close_price, volume
-        FROM hour_data
+        FROM {table_name}
         WHERE symbol = %s
         ORDER BY date DESC
         LIMIT 100
         """
-        
-        result = self.execute_query(query, (symbol,), fetch=True)
+
+        result = self._fetch_all(query, (symbol,), connection=connection)
         if result:
             kline_data = []
             for row in result:
@@ -620,15 +726,15 @@ class CryptoDatabase:
             return kline_data
         return []
     
-    def get_analysis_data(self, symbol):
+    def get_analysis_data(self, symbol='BTC', connection=None):
         """获取分析数据"""
         # 获取最新价格
-        latest_price = self.get_latest_price(symbol)
+        latest_price = self.get_latest_price(symbol, connection=connection)
         if not latest_price:
             return {}
-        
+
         # 获取历史数据进行简单分析
-        history = self.get_price_history(symbol, '24h')
+        history = self.get_price_history(symbol, '24h', connection=connection)
         if not history:
             return latest_price
         
@@ -1,14 +1,27 @@
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, Response, render_template, make_response, request
 from flask_cors import CORS
+from functools import lru_cache, wraps
+import hashlib
+import orjson
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+import concurrent.futures
 import os
+import socket
+import sys
 import threading
-import schedule
 import time
+import numpy as np
 import pytz
+from uuid import uuid4
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.executors.pool import ThreadPoolExecutor
+from apscheduler.triggers.cron import CronTrigger
 from dotenv import load_dotenv
+from jinja2 import FileSystemBytecodeCache
+import tempfile
 
 # 加载环境变量
 load_dotenv()
@@ -21,10 +34,110 @@ from data_processor import run_data_processing
 from crypto_analyzer import run_analysis
 from realtime_processor import run_realtime_processor_once
 from kline_processor import run_kline_processing
+from kline_backend import kline_backend
 
 # 配置日志
 logger = get_crypto_logger(__name__)
 
+# 最新价格完整响应的缓存键（带版本号，结构变化时升级版本即可失效旧缓存）
+LATEST_PRICES_CACHE_KEY = 'crypto:prices:latest:v1'
+
+def _detect_local_ip():
+    """探测本机局域网IP
+
+    优先使用主机名解析（无网络往返）；失败时退回UDP socket技巧，
+    但带0.2秒超时，受限网络环境下启动不会被卡住。
+    """
+    try:
+        # 主机名解析通常直接命中/etc/hosts或本地缓存
+        addresses = socket.gethostbyname_ex(socket.gethostname())[2]
+        for address in addresses:
+            if not address.startswith('127.'):
+                return address
+    except Exception:
+        pass
+
+    try:
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        s.settimeout(0.2)
+        # 连接远程地址不会真正发送数据，仅用于让内核选择出口IP
+        s.connect(("8.8.8.8", 80))
+        local_ip = s.getsockname()[0]
+        s.close()
+        return local_ip
+    except Exception:
+        return "127.0.0.1"
+
+# 导入时计算一次并缓存，启动横幅和日志直接复用
+_LOCAL_IP = _detect_local_ip()
+
+@lru_cache(maxsize=64)
+def _cached_kline_data(symbol, timeframe, limit, time_shard):
+    """按(symbol, timeframe, limit)缓存K线指标计算结果
+
+    time_shard每60秒翻转一次，突发的相同请求合并为一次计算。
+    """
+    return kline_backend.get_kline_data_with_indicators(symbol, timeframe, limit)
+
+def get_rate_limit_storage_uri():
+    """限流计数存储URI
+
+    与缓存共用同一个Redis实例，让限流计数在多worker/多Pod间共享；
+    内存存储每个进程各算各的，实际限额会被worker数放大。
+    """
+    uri = os.getenv('RATELIMIT_STORAGE_URI') or os.getenv('REDIS_URL')
+    if uri:
+        return uri
+
+    host = os.getenv('REDIS_HOST', 'localhost')
+    port = os.getenv('REDIS_PORT', '6379')
+    db = os.getenv('REDIS_DB', '0')
+    password = os.getenv('REDIS_PASSWORD')
+    auth = f':{password}@' if password else ''
+    return f'redis://{auth}{host}:{port}/{db}'
+
+def json_response(obj, status=200):
+    """使用orjson序列化的JSON响应
+
+    比stdlib json快数倍，原生支持numpy数组和datetime，
+    图表端点每次要序列化上百条OHLCV记录，收益明显。
+    """
+    return Response(
+        orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC),
+        status=status,
+        mimetype='application/json'
+    )
+
+def cacheable(max_age=30):
+    """为JSON端点添加ETag/304协商缓存和Cache-Control头
+
+    数据每分钟最多变化一次，但页面每次加载都会重新拉取。
+    max-age内浏览器完全不发请求，这是真正省掉服务端工作的部分；
+    ETag命中时处理器仍会完整执行（读缓存/数据库并序列化出响应体
+    后才算出ETag），304只省去响应体的网络传输。
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            response = make_response(func(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+
+            etag = hashlib.blake2b(response.get_data(), digest_size=16).hexdigest()
+            cache_control = f'public, max-age={max_age}'
+
+            if request.headers.get('If-None-Match') == etag:
+                not_modified = Response(status=304)
+                not_modified.headers['ETag'] = etag
+                not_modified.headers['Cache-Control'] = cache_control
+                return not_modified
+
+            response.headers['ETag'] = etag
+            response.headers['Cache-Control'] = cache_control
+            return response
+        return wrapper
+    return decorator
+
 class CryptoWebApp:
     def __init__(self):
         # 获取项目根目录路径
@@ -40,10 +153,18 @@ class CryptoWebApp:
             template_folder = os.path.join(project_root, 'frontend', 'templates')
             static_folder = os.path.join(project_root, 'frontend', 'static')
         
-        self.app = Flask(__name__, 
+        self.app = Flask(__name__,
                         template_folder=template_folder,
                         static_folder=static_folder)
         CORS(self.app)
+
+        # 启用Jinja字节码缓存并关闭模板自动重载：
+        # 页面模板只在部署时变化，重复渲染无需再解析/编译
+        jinja_cache_dir = os.path.join(tempfile.gettempdir(), 'crypto_jinja_cache')
+        os.makedirs(jinja_cache_dir, exist_ok=True)
+        self.app.jinja_env.bytecode_cache = FileSystemBytecodeCache(jinja_cache_dir)
+        self.app.jinja_env.auto_reload = False
+        self.app.config['TEMPLATES_AUTO_RELOAD'] = False
         
         # 配置静态文件缓存控制
         @self.app.after_request
@@ -56,12 +177,15 @@ class CryptoWebApp:
                 response.headers['Expires'] = '0'
             return response
         
-        # 初始化限流器
+        # 初始化限流器（计数存放在Redis，多worker部署时限额仍然准确；
+        # Redis不可用时降级为进程内计数，限流变不精确但接口不报500）
         self.limiter = Limiter(
             app=self.app,
             key_func=get_remote_address,
             default_limits=["200 per day", "50 per hour"],
-            storage_uri="memory://"
+            storage_uri=get_rate_limit_storage_uri(),
+            strategy='moving-window',
+            in_memory_fallback_enabled=True
         )
         
         self.db = CryptoDatabase()
@@ -75,10 +199,25 @@ class CryptoWebApp:
             logger.warning(f"Redis缓存管理器初始化失败: {e}")
             self.redis_manager = None
         
-        # 初始化后台调度器
-        self.is_running = False
-        self.scheduler_thread = None
-        
+        # 初始化后台调度器（延迟到start_background_scheduler时创建）
+        self.scheduler = None
+
+        # 实时任务专用执行器：单线程+超时控制，上游卡住不会拖垮30秒节奏
+        self._realtime_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='realtime_tick')
+        self._realtime_future = None
+
+        # 用户触发的长任务（如图表刷新）在后台执行器中运行，请求线程立即返回。
+        # matplotlib全局状态非线程安全，分析任务只允许单线程执行
+        self.bg_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='refresh')
+        self.jobs = {}
+        # 刷新端点与定时分析/完整处理共用一把锁，保证任何时刻只有一个run_analysis
+        self._analysis_lock = threading.Lock()
+
+        # 系统状态缓存：监控系统高频轮询该端点，健康检查结果复用5秒
+        self._status_cache = (0.0, None)
+
         self.setup_routes()
     
     def setup_routes(self):
@@ -94,17 +233,18 @@ class CryptoWebApp:
         
         # API路由（带限流）
         self.app.route('/api/health', methods=['GET'])(self.api_health_check)
-        self.app.route('/api/latest_prices')(self.limiter.limit("30 per minute")(self.api_latest_prices))
+        self.app.route('/api/latest_prices')(self.limiter.limit("30 per minute")(cacheable(30)(self.api_latest_prices)))
         self.app.route('/api/price_history')(self.limiter.limit("20 per minute")(self.api_price_history))
         self.app.route('/api/chart_data')(self.limiter.limit("20 per minute")(self.api_chart_data))
-        self.app.route('/api/btc_chart')(self.api_btc_chart)
-        self.app.route('/api/eth_chart')(self.api_eth_chart)
-        self.app.route('/api/kline_chart')(self.api_kline_chart)
+        self.app.route('/api/btc_chart')(cacheable(30)(self.api_btc_chart))
+        self.app.route('/api/eth_chart')(cacheable(30)(self.api_eth_chart))
+        self.app.route('/api/kline_chart')(cacheable(30)(self.api_kline_chart))
         self.app.route('/api/analysis')(self.limiter.limit("10 per minute")(self.api_analysis))
         self.app.route('/api/btc_data')(self.limiter.limit("15 per minute")(self.api_btc_data))
         self.app.route('/api/eth_data')(self.limiter.limit("15 per minute")(self.api_eth_data))
         self.app.route('/api/kline_data')(self.limiter.limit("10 per minute")(self.api_kline_data))
         self.app.route('/api/refresh_charts', methods=['POST'])(self.limiter.limit("5 per minute")(self.api_refresh_charts))
+        self.app.route('/api/refresh_charts/<job_id>')(self.api_refresh_charts_status)
         self.app.route('/api/system/status')(self.api_system_status)
         
         # 缓存管理API
@@ -121,13 +261,27 @@ class CryptoWebApp:
         # 限流错误处理
         @self.app.errorhandler(429)
         def ratelimit_handler(e):
-            return jsonify({
+            return json_response({
                 'success': False,
                 'error': 'Rate limit exceeded',
                 'message': '请求过于频繁，请稍后再试',
                 'retry_after': getattr(e, 'retry_after', None)
             }), 429
     
+    @contextmanager
+    def _conn(self):
+        """从连接池借出连接，退出时归还（不关闭池）"""
+        connection = self.db.get_connection()
+        if not connection:
+            raise RuntimeError('数据库连接失败')
+        try:
+            yield connection
+        finally:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
     def process_chart_data(self, data, symbol):
         """处理图表数据，计算三条曲线：价格、成交量、波动率"""
         if not data:
@@ -154,11 +308,11 @@ class CryptoWebApp:
         price_data = []
         volume_data = []
         volatility_data = []
-        
+
         # 计算移动平均和波动率的窗口大小
         window_size = min(10, len(filtered_data))
-        
-        for i, item in enumerate(filtered_data):
+
+        for item in filtered_data:
             # 价格数据
             price_data.append({
                 'date': item['date'],
@@ -168,68 +322,69 @@ class CryptoWebApp:
                 'low': item['low'],
                 'open': item['open']
             })
-            
+
             # 成交量数据
             volume_data.append({
                 'date': item['date'],
                 'timestamp_ms': item.get('timestamp_ms'),
                 'volume': item['volume']
             })
-            
-            # 计算波动率（使用滑动窗口）
-            if i >= window_size - 1:
-                # 获取窗口内的价格数据
-                window_prices = [filtered_data[j]['close'] for j in range(i - window_size + 1, i + 1)]
-                
-                # 计算标准差作为波动率
-                mean_price = sum(window_prices) / len(window_prices)
-                variance = sum((price - mean_price) ** 2 for price in window_prices) / len(window_prices)
-                volatility = variance ** 0.5
-                
-                volatility_data.append({
-                    'date': item['date'],
-                    'timestamp_ms': item.get('timestamp_ms'),
-                    'volatility': volatility,
-                    'volatility_percent': (volatility / mean_price) * 100 if mean_price > 0 else 0
-                })
-        
+
+        # 计算波动率（滑动窗口标准差，使用累积和一次性向量化计算）
+        n = len(filtered_data)
+        closes = np.fromiter((item['close'] for item in filtered_data), dtype=np.float64, count=n)
+        csum = np.concatenate(([0.0], np.cumsum(closes)))
+        csum2 = np.concatenate(([0.0], np.cumsum(closes * closes)))
+
+        # 窗口均值/方差：cumsum差分，O(N)完成所有窗口
+        means = (csum[window_size:] - csum[:-window_size]) / window_size
+        varis = (csum2[window_size:] - csum2[:-window_size]) / window_size - means ** 2
+        vols = np.sqrt(np.maximum(varis, 0.0))
+        vol_pcts = np.where(means > 0, vols / np.where(means > 0, means, 1.0) * 100.0, 0.0)
+
+        for offset, item in enumerate(filtered_data[window_size - 1:]):
+            volatility_data.append({
+                'date': item['date'],
+                'timestamp_ms': item.get('timestamp_ms'),
+                'volatility': float(vols[offset]),
+                'volatility_percent': float(vol_pcts[offset])
+            })
+
         return {
             'price_data': price_data,
             'volume_data': volume_data,
             'volatility_data': volatility_data
         }
     
-    def calculate_24h_change(self, symbol, current_price, connection):
-        """基于历史数据计算24小时变化"""
+    def get_prices_24h_ago(self, symbols, connection):
+        """一次查询获取所有symbol的24小时前价格"""
+        if not symbols:
+            return {}
+
         try:
-            # 获取24小时前的价格数据（从hour_data表获取24小时前的数据）
-            query = """
-            SELECT close_price 
-            FROM hour_data 
-            WHERE symbol = %s 
-            AND date <= DATE_SUB(NOW(), INTERVAL 24 HOUR)
-            ORDER BY date DESC 
-            LIMIT 1
+            # 每个symbol取24小时前最近的一条hour_data记录，单次查询完成
+            placeholders = ', '.join(['%s'] * len(symbols))
+            query = f"""
+            SELECT h.symbol, h.close_price
+            FROM hour_data h
+            WHERE h.symbol IN ({placeholders})
+            AND h.date = (
+                SELECT MAX(date) FROM hour_data
+                WHERE symbol = h.symbol
+                AND date <= DATE_SUB(NOW(), INTERVAL 24 HOUR)
+            )
             """
-            
+
             cursor = connection.cursor()
-            cursor.execute(query, (symbol,))
-            result = cursor.fetchone()
+            cursor.execute(query, tuple(symbols))
+            rows = cursor.fetchall()
             cursor.close()
-            
-            if result and result[0]:
-                price_24h_ago = float(result[0])
-                # 计算24小时变化百分比: (当前价格 - 24小时前价格) / 24小时前价格 * 100
-                change_24h = ((current_price - price_24h_ago) / price_24h_ago) * 100
-                logger.info(f"{symbol}: 当前价格 ${current_price:.2f}, 24h前价格 ${price_24h_ago:.2f}, 计算变化 {change_24h:.2f}%")
-                return change_24h
-            else:
-                logger.warning(f"{symbol}: 没有找到24小时前的价格数据，使用API提供的变化值")
-                return None
-                
+
+            return {row[0]: float(row[1]) for row in rows if row[1]}
+
         except Exception as e:
-            logger.error(f"计算{symbol}的24小时变化时出错: {str(e)}")
-            return None
+            logger.error(f"批量获取24小时前价格时出错: {str(e)}")
+            return {}
 
     def get_latest_prices(self):
         """从缓存或数据库获取最新价格"""
@@ -261,24 +416,37 @@ class CryptoWebApp:
                 logger.warning("数据库中没有价格数据")
                 return []
             
+            # 一次性查询所有symbol的24小时前价格，避免每个symbol一次数据库往返
+            prices_24h_ago = self.get_prices_24h_ago([row[1] for row in data], connection)
+
             # 转换数据格式并重新计算24小时变化
             result = []
             for item in data:
                 name, symbol, price, api_change_24h, timestamp = item
                 current_price = float(price)
+
+                # 基于历史数据计算24小时变化；没有历史数据时使用API提供的值
+                price_24h_ago = prices_24h_ago.get(symbol)
+                if price_24h_ago:
+                    change_24h = ((current_price - price_24h_ago) / price_24h_ago) * 100
+                else:
+                    logger.warning(f"{symbol}: 没有找到24小时前的价格数据，使用API提供的变化值")
+                    change_24h = float(api_change_24h) if api_change_24h is not None else 0.0
                 
-                # 尝试基于历史数据计算24小时变化
-                calculated_change = self.calculate_24h_change(symbol, current_price, connection)
-                
-                # 如果计算成功，使用计算值；否则使用API提供的值
-                change_24h = calculated_change if calculated_change is not None else (float(api_change_24h) if api_change_24h is not None else 0.0)
-                
+                # isinstance比hasattr快（后者内部靠捕获AttributeError实现），
+                # f-string格式化也明显快于strftime
+                if isinstance(timestamp, datetime):
+                    ts = (f"{timestamp.year:04d}-{timestamp.month:02d}-{timestamp.day:02d} "
+                          f"{timestamp.hour:02d}:{timestamp.minute:02d}:{timestamp.second:02d}")
+                else:
+                    ts = str(timestamp)
+
                 result.append({
                     'name': name,
                     'symbol': symbol,
                     'price': current_price,
                     'change_24h': change_24h,
-                    'timestamp': timestamp.strftime('%Y-%m-%d %H:%M:%S') if hasattr(timestamp, 'strftime') else str(timestamp)
+                    'timestamp': ts
                 })
             
             # 将数据缓存到Redis（缓存60秒）
@@ -324,44 +492,67 @@ class CryptoWebApp:
                 return []
             
             # 直接使用数据库的get_chart_data方法，它已经包含了时间戳处理逻辑
-            if self.db.connect():
-                data = self.db.get_chart_data(symbol, timeframe)
-                self.db.disconnect()
-                
-                if not data or len(data) == 0:
-                    logger.warning(f"数据库中没有{symbol}的{timeframe}级数据")
-                    return []
-                
-                # 数据库已经返回了正确格式的数据，包含timestamp_ms字段
-                result = []
-                for item in data:
-                    result.append({
-                        'symbol': symbol,
-                        'date': item['date'],
-                        'timestamp_ms': item['timestamp_ms'],
-                        'open': item['open'],
-                        'high': item['high'],
-                        'low': item['low'],
-                        'close': item['close'],
-                        'volume': item['volume']
-                    })
-                
-                # 将数据缓存到Redis（缓存5分钟）
-                if self.redis_manager and result:
-                    try:
-                        self.redis_manager.cache_chart_data(symbol, timeframe, result)
-                        logger.info(f"{symbol}的{timeframe}图表数据已缓存到Redis")
-                    except Exception as e:
-                        logger.warning(f"缓存图表数据到Redis失败: {e}")
-                
-                return result
-            else:
-                logger.error("数据库连接失败")
+            with self._conn() as conn:
+                data = self.db.get_chart_data(symbol, timeframe, connection=conn)
+
+            if not data or len(data) == 0:
+                logger.warning(f"数据库中没有{symbol}的{timeframe}级数据")
                 return []
+
+            # 数据库已经返回了正确格式的数据，包含timestamp_ms字段
+            result = []
+            for item in data:
+                result.append({
+                    'symbol': symbol,
+                    'date': item['date'],
+                    'timestamp_ms': item['timestamp_ms'],
+                    'open': item['open'],
+                    'high': item['high'],
+                    'low': item['low'],
+                    'close': item['close'],
+                    'volume': item['volume']
+                })
+
+            # 将数据缓存到Redis（缓存5分钟）
+            if self.redis_manager and result:
+                try:
+                    self.redis_manager.cache_chart_data(symbol, timeframe, result)
+                    logger.info(f"{symbol}的{timeframe}图表数据已缓存到Redis")
+                except Exception as e:
+                    logger.warning(f"缓存图表数据到Redis失败: {e}")
+
+            return result
         except Exception as e:
             logger.error(f"获取图表数据时出错: {str(e)}")
             return []
     
+    def get_processed_chart_data(self, timeframe, symbol, limit=100):
+        """获取处理后的三条曲线数据（带独立缓存，命中时跳过波动率计算）"""
+        # 处理结果键挂在crypto:chart:前缀下，清理图表缓存时一并失效
+        key = f'crypto:chart:processed:{symbol}:{timeframe}:v1'
+
+        if self.redis_manager:
+            try:
+                cached = self.redis_manager.get_json(key)
+                if cached:
+                    logger.info(f"从Redis缓存获取{symbol}的{timeframe}处理后图表数据")
+                    return cached
+            except Exception as e:
+                logger.warning(f"从Redis缓存获取处理后图表数据失败: {e}")
+
+        # 获取原始数据并处理，生成三条曲线
+        raw_data = self.get_chart_data(timeframe, symbol, limit)
+        processed_data = self.process_chart_data(raw_data, symbol)
+
+        # 缓存处理结果（TTL与原始图表缓存对齐）
+        if self.redis_manager and raw_data:
+            try:
+                self.redis_manager.set_json(key, processed_data, ttl=300)
+            except Exception as e:
+                logger.warning(f"缓存处理后图表数据失败: {e}")
+
+        return processed_data
+
     def get_cache_stats(self):
         """获取缓存统计信息"""
         if not self.redis_manager:
@@ -443,28 +634,36 @@ class CryptoWebApp:
     
     def api_health_check(self):
         """健康检查端点"""
-        return jsonify({'status': 'healthy', 'timestamp': datetime.now(pytz.UTC).isoformat()})
+        return json_response({'status': 'healthy', 'timestamp': datetime.now(pytz.UTC).isoformat()})
     
     def api_latest_prices(self):
         """获取最新价格API"""
         try:
-            # 先从缓存获取
+            # 先尝试完整结果缓存，命中时完全跳过数据库和24h变化计算
             if self.redis_manager:
-                btc_price = self.redis_manager.get_price('BTC')
-                eth_price = self.redis_manager.get_price('ETH')
-                
-                if btc_price and eth_price:
-                    return jsonify({'success': True, 'data': [btc_price, eth_price]})
-            
+                cached = self.redis_manager.get_json(LATEST_PRICES_CACHE_KEY)
+                if cached:
+                    return json_response({'success': True, 'data': cached})
+
+                # 一次MGET取回所有币种价格，避免逐币种的网络往返
+                prices_by_symbol = self.redis_manager.get_prices_mget(['BTC', 'ETH'])
+                if all(prices_by_symbol.values()):
+                    return json_response({'success': True, 'data': list(prices_by_symbol.values())})
+
             # 从数据库获取
             prices = self.get_latest_prices()
-            return jsonify({
+
+            # 缓存完整计算结果（短TTL，数据写入任务会主动失效）
+            if self.redis_manager and prices:
+                self.redis_manager.set_json(LATEST_PRICES_CACHE_KEY, prices, ttl=30)
+
+            return json_response({
                 'success': True,
                 'data': prices
             })
         except Exception as e:
             logger.error(f"获取最新价格失败: {e}")
-            return jsonify({
+            return json_response({
                 'success': False,
                 'error': str(e)
             }), 500
@@ -475,16 +674,13 @@ class CryptoWebApp:
             crypto = request.args.get('crypto', 'BTC')
             timeframe = request.args.get('timeframe', '24h')
             
-            # 从数据库获取价格历史
-            if self.db.connect():
-                history = self.db.get_price_history(crypto, timeframe)
-                self.db.disconnect()
-                return jsonify({'success': True, 'data': history if history else []})
-            else:
-                return jsonify({'success': False, 'error': '数据库连接失败'}), 500
+            # 从数据库获取价格历史（使用连接池，不再每次请求建立新连接）
+            with self._conn() as conn:
+                history = self.db.get_price_history(crypto, timeframe, connection=conn)
+            return json_response({'success': True, 'data': history if history else []})
         except Exception as e:
             logger.error(f"获取价格历史失败: {e}")
-            return jsonify({'success': False, 'error': str(e)}), 500
+            return json_response({'success': False, 'error': str(e)}), 500
     
     def api_chart_data(self):
         """API: 获取图表数据"""
@@ -494,38 +690,61 @@ class CryptoWebApp:
             limit = int(request.args.get('limit', 100))
             
             data = self.get_chart_data(timeframe, symbol, limit)
-            return jsonify({
+            return json_response({
                 'success': True,
                 'data': data
             })
         except Exception as e:
             logger.error(f"API获取图表数据时出错: {str(e)}")
-            return jsonify({
+            return json_response({
                 'success': False,
                 'error': str(e)
             }), 500
     
+    def _chart_response(self, symbol, timeframe, limit):
+        """构建图表JSON响应，优先直接返回Redis中预序列化的响应字节"""
+        if self.redis_manager:
+            try:
+                raw = self.redis_manager.get_chart_data_raw(symbol, timeframe)
+                if raw is not None:
+                    # 命中时直接把缓存字节作为响应体，完全跳过反序列化/再序列化
+                    return Response(raw, mimetype='application/json')
+            except Exception as e:
+                logger.warning(f"获取{symbol}预序列化图表缓存失败: {e}")
+
+        chart_data = self.get_chart_data(timeframe, symbol, limit)
+        body = orjson.dumps(
+            {'success': True, 'data': chart_data},
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC
+        )
+
+        if self.redis_manager and chart_data:
+            try:
+                self.redis_manager.cache_chart_data_raw(symbol, timeframe, body)
+            except Exception as e:
+                logger.warning(f"缓存{symbol}预序列化图表数据失败: {e}")
+
+        return Response(body, mimetype='application/json')
+
     def api_btc_chart(self):
         """获取BTC图表数据"""
         try:
             timeframe = request.args.get('timeframe', 'hour')
             limit = int(request.args.get('limit', 100))
-            chart_data = self.get_chart_data(timeframe, 'BTC', limit)
-            return jsonify({'success': True, 'data': chart_data})
+            return self._chart_response('BTC', timeframe, limit)
         except Exception as e:
             logger.error(f"获取BTC图表数据失败: {e}")
-            return jsonify({'success': False, 'error': str(e)}), 500
-    
+            return json_response({'success': False, 'error': str(e)}), 500
+
     def api_eth_chart(self):
         """获取ETH图表数据"""
         try:
             timeframe = request.args.get('timeframe', 'hour')
             limit = int(request.args.get('limit', 100))
-            chart_data = self.get_chart_data(timeframe, 'ETH', limit)
-            return jsonify({'success': True, 'data': chart_data})
+            return self._chart_response('ETH', timeframe, limit)
         except Exception as e:
             logger.error(f"获取ETH图表数据失败: {e}")
-            return jsonify({'success': False, 'error': str(e)}), 500
+            return json_response({'success': False, 'error': str(e)}), 500
     
     def api_kline_chart(self):
         """获取K线图表数据"""
@@ -533,39 +752,41 @@ class CryptoWebApp:
             symbol = request.args.get('symbol', 'BTC')
             timeframe = request.args.get('timeframe', 'hour')
             
-            if self.db.connect():
-                kline_data = self.db.get_kline_data(symbol, timeframe)
-                self.db.disconnect()
-                return jsonify({'success': True, 'data': kline_data if kline_data else []})
-            else:
-                return jsonify({'success': False, 'error': '数据库连接失败'}), 500
+            with self._conn() as conn:
+                kline_data = self.db.get_kline_data(symbol, timeframe, connection=conn)
+            return json_response({'success': True, 'data': kline_data if kline_data else []})
         except Exception as e:
             logger.error(f"获取K线数据失败: {e}")
-            return jsonify({'success': False, 'error': str(e)}), 500
+            return json_response({'success': False, 'error': str(e)}), 500
     
     def api_analysis(self):
         """获取分析报告"""
         try:
-            if self.db.connect():
-                analysis_data = self.db.get_analysis_data()
-                self.db.disconnect()
-                return jsonify({'success': True, 'data': analysis_data if analysis_data else {}})
-            else:
-                return jsonify({'success': False, 'error': '数据库连接失败'}), 500
+            with self._conn() as conn:
+                analysis_data = self.db.get_analysis_data(connection=conn)
+            return json_response({'success': True, 'data': analysis_data if analysis_data else {}})
         except Exception as e:
             logger.error(f"获取分析数据失败: {e}")
-            return jsonify({'success': False, 'error': str(e)}), 500
+            return json_response({'success': False, 'error': str(e)}), 500
     
     def api_system_status(self):
         """获取系统状态"""
         try:
-            # 检查数据库连接
+            # 5秒内的重复查询直接返回缓存结果，避免监控轮询反复做健康检查
+            cached_at, cached_status = self._status_cache
+            if cached_status and time.monotonic() - cached_at < 5.0:
+                return json_response({'success': True, 'data': cached_status})
+
+            # 检查数据库连接（从连接池借出验证，不新建TCP会话）
             db_status = 'disconnected'
             if self.db:
                 try:
-                    if self.db.connect():
-                        db_status = 'connected'
-                        self.db.disconnect()
+                    with self._conn() as conn:
+                        cursor = conn.cursor()
+                        cursor.execute('SELECT 1')
+                        cursor.fetchall()
+                        cursor.close()
+                    db_status = 'connected'
                 except Exception:
                     db_status = 'disconnected'
             
@@ -587,19 +808,20 @@ class CryptoWebApp:
                 'redis': redis_status,
                 'timestamp': datetime.now(pytz.UTC).isoformat()
             }
-            return jsonify({'success': True, 'data': status})
+            self._status_cache = (time.monotonic(), status)
+            return json_response({'success': True, 'data': status})
         except Exception as e:
             logger.error(f"获取系统状态失败: {e}")
-            return jsonify({'success': False, 'error': str(e)}), 500
+            return json_response({'success': False, 'error': str(e)}), 500
     
     def not_found(self, error):
         """404错误处理"""
-        return jsonify({'error': 'Not Found', 'message': 'The requested resource was not found'}), 404
+        return json_response({'error': 'Not Found', 'message': 'The requested resource was not found'}), 404
     
     def internal_error(self, error):
         """500错误处理"""
         logger.error(f"Internal server error: {error}")
-        return jsonify({'error': 'Internal Server Error', 'message': 'An internal error occurred'}), 500
+        return json_response({'error': 'Internal Server Error', 'message': 'An internal error occurred'}), 500
     
     def api_btc_data(self):
         """API: 获取比特币数据（三条曲线）"""
@@ -607,19 +829,16 @@ class CryptoWebApp:
             timeframe = request.args.get('timeframe', 'hour')
             limit = int(request.args.get('limit', 100))
             
-            # 获取原始数据
-            raw_data = self.get_chart_data(timeframe, 'BTC', limit)
-            
-            # 处理数据，生成三条曲线
-            processed_data = self.process_chart_data(raw_data, 'BTC')
-            
-            return jsonify({
+            # 获取处理后的三条曲线数据（优先命中处理结果缓存）
+            processed_data = self.get_processed_chart_data(timeframe, 'BTC', limit)
+
+            return json_response({
                 'success': True,
                 'data': processed_data
             })
         except Exception as e:
             logger.error(f"API获取比特币数据时出错: {str(e)}")
-            return jsonify({
+            return json_response({
                 'success': False,
                 'error': str(e)
             }), 500
@@ -630,48 +849,67 @@ class CryptoWebApp:
             timeframe = request.args.get('timeframe', 'hour')
             limit = int(request.args.get('limit', 100))
             
-            # 获取原始数据
-            raw_data = self.get_chart_data(timeframe, 'ETH', limit)
-            
-            # 处理数据，生成三条曲线
-            processed_data = self.process_chart_data(raw_data, 'ETH')
-            
-            return jsonify({
+            # 获取处理后的三条曲线数据（优先命中处理结果缓存）
+            processed_data = self.get_processed_chart_data(timeframe, 'ETH', limit)
+
+            return json_response({
                 'success': True,
                 'data': processed_data
             })
         except Exception as e:
             logger.error(f"API获取以太坊数据时出错: {str(e)}")
-            return jsonify({
+            return json_response({
                 'success': False,
                 'error': str(e)
             }), 500
     
     def api_refresh_charts(self):
-        """API: 刷新图表"""
+        """API: 刷新图表（提交后台任务，立即返回202）"""
         try:
-            # 调用独立的分析函数生成新的图表
-            run_analysis()
-            
-            return jsonify({
+            # 提交前清理已完成的任务记录，避免jobs字典无限增长
+            done_jobs = [jid for jid, f in self.jobs.items() if f.done()]
+            for jid in done_jobs:
+                del self.jobs[jid]
+
+            # 分析任务耗时较长，提交到后台执行器，不占用请求线程
+            job_id = uuid4().hex
+            self.jobs[job_id] = self.bg_executor.submit(self._run_analysis_serialized)
+
+            return json_response({
                 'success': True,
-                'message': '图表已刷新'
-            })
+                'job_id': job_id,
+                'message': '图表刷新任务已提交'
+            }), 202
         except Exception as e:
             logger.error(f"API刷新图表时出错: {str(e)}")
-            return jsonify({
+            return json_response({
                 'success': False,
                 'error': str(e)
             }), 500
+
+    def api_refresh_charts_status(self, job_id):
+        """API: 查询图表刷新任务状态"""
+        future = self.jobs.get(job_id)
+        if future is None:
+            return json_response({'success': False, 'error': '任务不存在'}), 404
+
+        if not future.done():
+            status = 'running'
+        elif future.exception():
+            status = 'error'
+        else:
+            status = 'done'
+
+        return json_response({'success': True, 'job_id': job_id, 'status': status})
     
     def api_cache_stats(self):
         """API: 获取缓存统计信息"""
         try:
             stats = self.get_cache_stats()
-            return jsonify(stats)
+            return json_response(stats)
         except Exception as e:
             logger.error(f"API获取缓存统计信息时出错: {str(e)}")
-            return jsonify({
+            return json_response({
                 'status': 'error',
                 'message': str(e)
             }), 500
@@ -679,96 +917,39 @@ class CryptoWebApp:
     def api_clear_cache(self):
         """API: 清理缓存"""
         try:
-            cache_type = request.json.get('type') if request.json else None
+            # get_json带缓存且静默：非JSON请求体不抛异常、不重复解析
+            body = request.get_json(silent=True, cache=True) or {}
+            cache_type = body.get('type')
             result = self.clear_cache(cache_type)
-            
+
             if result['success']:
-                return jsonify(result)
+                return json_response(result)
             else:
-                return jsonify(result), 400
+                return json_response(result), 400
         except Exception as e:
             logger.error(f"API清理缓存时出错: {str(e)}")
-            return jsonify({
+            return json_response({
                 'success': False,
                 'message': str(e)
             }), 500
-    
-    def get_cache_stats(self):
-        """获取缓存统计信息"""
-        try:
-            if not self.redis_manager:
-                return {
-                    'status': 'error',
-                    'message': 'Redis管理器未初始化'
-                }
-            
-            stats = self.redis_manager.get_cache_stats()
-            return {
-                'status': 'success',
-                'data': stats
-            }
-        except Exception as e:
-            logger.error(f"获取缓存统计信息失败: {e}")
-            return {
-                'status': 'error',
-                'message': str(e)
-            }
-    
-    def clear_cache(self, cache_type=None):
-        """清理缓存"""
-        try:
-            if not self.redis_manager:
-                return {
-                    'success': False,
-                    'message': 'Redis管理器未初始化'
-                }
-            
-            if cache_type == 'all' or cache_type is None:
-                # 清理所有缓存
-                success = self.redis_manager.clear_all_cache()
-                if success:
-                    return {
-                        'success': True,
-                        'message': '所有缓存已清理'
-                    }
-                else:
-                    return {
-                        'success': False,
-                        'message': '清理缓存失败'
-                    }
-            else:
-                return {
-                    'success': False,
-                    'message': f'不支持的缓存类型: {cache_type}'
-                }
-        except Exception as e:
-            logger.error(f"清理缓存失败: {e}")
-            return {
-                'success': False,
-                'message': str(e)
-            }
-    
 
-    
     def api_kline_data(self):
         """API: 获取K线数据"""
         try:
-            from kline_backend import kline_backend
-            
             symbol = request.args.get('symbol', 'BTC')
             timeframe = request.args.get('timeframe', 'hour')
             limit = int(request.args.get('limit', 100))
+
+            # 使用后端处理模块获取数据（60秒内相同请求命中进程内缓存）
+            data = _cached_kline_data(symbol, timeframe, limit, int(time.time() // 60))
             
-            # 使用新的后端处理模块获取数据
-            data = kline_backend.get_kline_data_with_indicators(symbol, timeframe, limit)
-            
-            return jsonify({
+            return json_response({
                 'success': True,
                 'data': data
             })
         except Exception as e:
             logger.error(f"API获取K线数据时出错: {str(e)}")
-            return jsonify({
+            return json_response({
                 'success': False,
                 'error': str(e)
             }), 500
@@ -776,48 +957,96 @@ class CryptoWebApp:
     def schedule_tasks(self):
         """设置定时任务"""
         logger.info("设置定时任务")
-        
+
+        # 使用APScheduler后台调度器：实时任务和批处理任务分别使用独立线程池，
+        # 长任务（如完整处理）不会阻塞30秒实时任务
+        self.scheduler = BackgroundScheduler(
+            executors={
+                'realtime': ThreadPoolExecutor(max_workers=1),
+                'batch': ThreadPoolExecutor(max_workers=3)
+            },
+            job_defaults={'coalesce': True, 'max_instances': 1}
+        )
+
         # 每2分钟运行一次数据收集
-        schedule.every(2).minutes.do(self.run_data_collection_task)
-        
-        # 每30秒运行一次实时数据处理
-        schedule.every(30).seconds.do(self.run_realtime_task)
-        
+        self.scheduler.add_job(self.run_data_collection_task, 'interval',
+                               minutes=2, id='data_collection', executor='batch')
+
+        # 每30秒运行一次实时数据处理；超过宽限期的错过执行直接跳过而不是排队
+        self.scheduler.add_job(self.run_realtime_task, 'interval',
+                               seconds=30, id='realtime', executor='realtime',
+                               misfire_grace_time=15)
+
         # 每小时运行一次分析
-        schedule.every().hour.do(self.run_analysis_task)
-        
+        self.scheduler.add_job(self.run_analysis_task, CronTrigger(minute=0),
+                               id='analysis', executor='batch')
+
         # 每天凌晨2点运行完整处理
-        schedule.every().day.at("02:00").do(self.run_full_processing)
-        
+        self.scheduler.add_job(self.run_full_processing, CronTrigger(hour=2, minute=0),
+                               id='full_processing', executor='batch')
+
         logger.info("定时任务设置完成")
     
     def run_realtime_task(self):
-        """运行实时数据处理任务"""
+        """运行实时数据处理任务（带超时，卡住的上游不会拖垮30秒节奏）"""
         logger.info("执行实时数据处理任务")
+
+        # 上一轮还没结束就跳过本轮，避免任务在执行器中排队堆积
+        if self._realtime_future and not self._realtime_future.done():
+            logger.warning("上一轮实时数据处理仍在进行，跳过本轮")
+            return
+
         try:
-            if run_realtime_processor_once():
+            self._realtime_future = self._realtime_executor.submit(run_realtime_processor_once)
+            if self._realtime_future.result(timeout=25):
+                self.invalidate_latest_prices_cache()
                 logger.info("实时数据处理任务完成")
             else:
                 logger.error("实时数据处理任务失败")
+        except concurrent.futures.TimeoutError:
+            logger.error("实时数据处理任务超时（25秒），等待下一轮")
         except Exception as e:
             logger.error(f"实时数据处理任务异常: {str(e)}")
+
+    def invalidate_latest_prices_cache(self):
+        """数据写入成功后主动失效最新价格缓存，不等TTL过期
+
+        两个键要一起删：get_latest_prices仍会读旧的crypto:latest_prices，
+        只删v1键的话下一个请求会把旧数据重新提升回去。
+        """
+        if self.redis_manager:
+            try:
+                self.redis_manager.delete(LATEST_PRICES_CACHE_KEY,
+                                          'crypto:latest_prices')
+            except Exception as e:
+                logger.warning(f"失效最新价格缓存失败: {e}")
     
     def run_data_collection_task(self):
         """运行数据收集任务"""
         logger.info("执行定时数据收集任务")
         try:
             if run_data_processing():
+                self.invalidate_latest_prices_cache()
                 logger.info("定时数据收集任务完成")
             else:
                 logger.error("定时数据收集任务失败")
         except Exception as e:
             logger.error(f"定时数据收集任务异常: {str(e)}")
     
+    def _run_analysis_serialized(self):
+        """串行执行分析任务
+
+        crypto_analyzer通过matplotlib.pyplot的全局状态机画图，
+        并发运行会交错figure产生损坏的图片，全程持锁保证互斥。
+        """
+        with self._analysis_lock:
+            return run_analysis()
+
     def run_analysis_task(self):
         """运行分析任务"""
         logger.info("执行定时分析任务")
         try:
-            if run_analysis():
+            if self._run_analysis_serialized():
                 logger.info("定时分析任务完成")
             else:
                 logger.error("定时分析任务失败")
@@ -828,94 +1057,75 @@ class CryptoWebApp:
         """运行完整处理流程"""
         logger.info("执行完整处理流程")
         try:
-            # 数据处理
+            # 数据处理必须先完成，后续阶段都依赖新抓取的数据
             if run_data_processing():
                 logger.info("完整数据处理完成")
             else:
                 logger.error("完整数据处理失败")
-            
-            # 分析报告
-            if run_analysis():
-                logger.info("完整分析报告生成完成")
-            else:
-                logger.error("完整分析报告生成失败")
-                
+
+            # 分析报告和K线处理互相独立，并行执行缩短夜间处理窗口
+            with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+                futures = {
+                    executor.submit(self._run_analysis_serialized): '完整分析报告生成',
+                    executor.submit(run_kline_processing): '完整K线数据处理'
+                }
+                for future, task_name in futures.items():
+                    try:
+                        if future.result(timeout=1800):
+                            logger.info(f"{task_name}完成")
+                        else:
+                            logger.error(f"{task_name}失败")
+                    except Exception as e:
+                        logger.error(f"{task_name}异常: {str(e)}")
+
         except Exception as e:
             logger.error(f"完整处理流程异常: {str(e)}")
     
-    def run_scheduler(self):
-        """运行调度器"""
-        logger.info("启动任务调度器")
-        self.is_running = True
-        
-        while self.is_running:
-            try:
-                schedule.run_pending()
-                time.sleep(30)  # 每30秒检查一次
-            except KeyboardInterrupt:
-                logger.info("收到中断信号，正在停止系统...")
-                self.is_running = False
-                break
-            except Exception as e:
-                logger.error(f"调度器运行异常: {str(e)}")
-                time.sleep(60)  # 出错后等待1分钟再继续
-    
     def start_background_scheduler(self):
         """启动后台调度器"""
-        if not self.scheduler_thread or not self.scheduler_thread.is_alive():
+        if not self.scheduler or not self.scheduler.running:
             self.schedule_tasks()
-            self.scheduler_thread = threading.Thread(target=self.run_scheduler)
-            self.scheduler_thread.daemon = True
-            self.scheduler_thread.start()
+            self.scheduler.start()
             logger.info("后台调度器已启动")
         else:
             logger.info("后台调度器已在运行中")
-    
+
     def stop_background_scheduler(self):
         """停止后台调度器"""
-        self.is_running = False
-        if self.scheduler_thread and self.scheduler_thread.is_alive():
-            self.scheduler_thread.join(timeout=5)
+        if self.scheduler and self.scheduler.running:
+            self.scheduler.shutdown(wait=False)
             logger.info("后台调度器已停止")
     
     def get_local_ip(self):
-        """获取本机局域网IP地址"""
-        try:
-            import socket
-            # 创建一个UDP socket
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            # 连接到一个远程地址（不会真正发送数据）
-            s.connect(("8.8.8.8", 80))
-            local_ip = s.getsockname()[0]
-            s.close()
-            return local_ip
-        except Exception:
-            return "127.0.0.1"
+        """获取本机局域网IP地址（导入时已探测，直接返回缓存值）"""
+        return _LOCAL_IP
     
     def run(self, debug=True, host='0.0.0.0', port=5000, enable_scheduler=True):
         """运行应用"""
         local_ip = self.get_local_ip()
-        
-        print("\n" + "="*60)
-        print("🚀 加密货币监控系统 - Web服务器已启动")
-        print("="*60)
-        print(f"📍 本地访问地址: http://127.0.0.1:{port}")
-        print(f"🌐 局域网访问地址: http://{local_ip}:{port}")
-        print(f"📱 手机访问地址: http://{local_ip}:{port}")
-        print("\n💡 让其他人访问的方法:")
-        print(f"   1. 同一局域网用户可直接访问: http://{local_ip}:{port}")
-        print(f"   2. 手机连接同一WiFi后访问: http://{local_ip}:{port}")
-        print("   3. 外网访问需要配置路由器端口转发")
-        
-        if enable_scheduler:
-            print("\n🔄 后台服务状态:")
-            print("   ✅ 实时数据处理: 每30秒执行")
-            print("   ✅ 数据收集任务: 每5分钟执行")
-            print("   ✅ 分析任务: 每小时执行")
-            print("   ✅ 完整处理: 每天凌晨2点执行")
-        
-        print("="*60)
-        
+
+        # 启动横幅只在交互终端打印；容器/重定向环境下靠logger记录启动信息
+        if sys.stdout.isatty():
+            print("\n" + "="*60)
+            print("🚀 加密货币监控系统 - Web服务器已启动")
+            print("="*60)
+            print(f"📍 本地访问地址: http://127.0.0.1:{port}")
+            print(f"🌐 局域网访问地址: http://{local_ip}:{port}")
+            print(f"📱 手机访问地址: http://{local_ip}:{port}")
+            print("\n💡 让其他人访问的方法:")
+            print(f"   1. 同一局域网用户可直接访问: http://{local_ip}:{port}")
+            print(f"   2. 手机连接同一WiFi后访问: http://{local_ip}:{port}")
+            print("   3. 外网访问需要配置路由器端口转发")
+
+            if enable_scheduler:
+                print("\n🔄 后台服务状态:")
+                print("   ✅ 实时数据处理: 每30秒执行")
+                print("   ✅ 数据收集任务: 每5分钟执行")
+                print("   ✅ 分析任务: 每小时执行")
+                print("   ✅ 完整处理: 每天凌晨2点执行")
+
+            print("="*60)
+
         logger.info(f"启动Web应用，本地地址: http://127.0.0.1:{port}")
         logger.info(f"启动Web应用，局域网地址: http://{local_ip}:{port}")
         
@@ -936,4 +1146,10 @@ crypto_app = CryptoWebApp()
 app = crypto_app.app  # Flask 应用对象
 
 if __name__ == '__main__':
-    crypto_app.run(debug=False, host='0.0.0.0', port=8000)
\ No newline at end of file
+    # Werkzeug开发服务器仅限本地调试（需显式设置DEV=1）；
+    # 生产环境请通过wsgi.py用gunicorn启动：
+    #   gunicorn -w 4 -k gthread --threads 8 -b 0.0.0.0:8000 wsgi:app
+    if os.getenv('DEV') == '1':
+        crypto_app.run(debug=False, host='0.0.0.0', port=8000)
+    else:
+        print("生产环境请使用 gunicorn 启动（见 wsgi.py）；本地调试请设置 DEV=1")
\ No newline at end of file
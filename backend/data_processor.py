@@ -2,7 +2,9 @@ from crypto_scraper import scrape_all_crypto_data
 from crypto_db import CryptoDatabase
 from timestamp_manager import get_timestamp_manager
 from datetime import datetime, timedelta
+import logging
 import pandas as pd
+import threading
 import time
 from logger_config import get_crypto_logger
 
@@ -27,43 +29,36 @@ class DataProcessor:
             logger.info("开始抓取加密货币数据")
             current_data, historical_data = scrape_all_crypto_data()
             
-            # 存储当前价格数据
+            # 存储当前价格数据（批量插入，一次提交）
             if current_data:
                 logger.info("开始存储当前价格数据")
-                for data in current_data:
-                    success = self.db.insert_current_price(
-                        data['symbol'],
-                        data['price'],
-                        data['change_24h'],
-                        data['timestamp']
-                    )
-                    if success:
-                        logger.info(f"成功存储 {data['name']} 当前价格: ${data['price']:,.2f}")
-                    else:
-                        logger.error(f"存储 {data['name']} 当前价格失败")
-            
-            # 存储历史数据
+                price_rows = [
+                    (data['symbol'], data['price'], data['change_24h'], data['timestamp'])
+                    for data in current_data
+                ]
+                if self.db.insert_current_prices_batch(price_rows):
+                    logger.info("成功存储 %d 条当前价格数据", len(price_rows))
+                else:
+                    logger.error("批量存储当前价格数据失败")
+
+            # 存储历史数据（整个时间范围一次executemany，不再逐行往返）
             for timeframe, df in historical_data.items():
                 if not df.empty:
-                    logger.info(f"开始存储 {timeframe} 级历史数据，共 {len(df)} 条记录")
-                    
-                    for _, row in df.iterrows():
-                        success = self.db.insert_historical_data(
-                            timeframe,
-                            row['symbol'],
-                            row['date'],
-                            row['open'],
-                            row['high'],
-                            row['low'],
-                            row['close'],
-                            row['volume'],
-                            row['quote_volume']
-                        )
-                        
-                        if not success:
-                            logger.error(f"存储历史数据失败: {row['symbol']} - {row['date']}")
-                    
-                    logger.info(f"完成存储 {timeframe} 级历史数据")
+                    logger.info("开始存储 %s 级历史数据，共 %d 条记录", timeframe, len(df))
+
+                    # 先整列转为float64再一次性取出，避免逐格装箱numpy标量
+                    rows = (df[['symbol', 'date', 'open', 'high', 'low',
+                                'close', 'volume', 'quote_volume']]
+                            .astype({'open': 'float64', 'high': 'float64',
+                                     'low': 'float64', 'close': 'float64',
+                                     'volume': 'float64', 'quote_volume': 'float64'})
+                            .to_numpy()
+                            .tolist())
+
+                    if self.db.insert_historical_batch(timeframe, rows):
+                        logger.info("完成存储 %s 级历史数据", timeframe)
+                    else:
+                        logger.error("批量存储 %s 级历史数据失败", timeframe)
             
             logger.info("数据处理和存储完成")
             return True
@@ -71,36 +66,47 @@ class DataProcessor:
         except Exception as e:
             logger.error(f"数据处理过程中发生错误: {str(e)}")
             return False
-        
-        finally:
-            self.db.disconnect()
+        # 连接保持存活，下一次定时任务直接复用，不再反复借出/归还
     
     def get_summary_statistics(self):
         """获取数据统计摘要"""
         if not self.db.connect():
             return None
-        
-        try:
-            stats = {}
-            
-            # 获取最新价格
-            latest_prices = self.db.get_latest_prices()
-            stats['latest_prices'] = latest_prices
-            
-            # 获取各时间范围的数据量统计
-            for timeframe in ['minute', 'hour', 'day']:
-                data = self.db.get_historical_data(timeframe, limit=1000)
-                stats[f'{timeframe}_data_count'] = len(data) if data else 0
-            
-            return stats
-            
-        finally:
-            self.db.disconnect()
+
+        stats = {}
+
+        # 获取最新价格
+        latest_prices = self.db.get_latest_prices()
+        stats['latest_prices'] = latest_prices
+
+        # 获取各时间范围的数据量统计（单次聚合查询）
+        counts = self.db.get_historical_counts()
+        for timeframe in ['minute', 'hour', 'day']:
+            stats[f'{timeframe}_data_count'] = counts.get(timeframe, 0)
+
+        return stats
+
+# 模块级单例：调度器每轮复用同一个处理器（及其数据库连接池）
+_processor = None
+
+# 定时收集与凌晨完整处理可能同时触发本函数；两者共享同一条
+# 数据库连接，必须整轮串行，避免两个线程交错执行executemany/commit
+_run_lock = threading.Lock()
+
+def _get_processor():
+    global _processor
+    if _processor is None:
+        _processor = DataProcessor()
+    return _processor
 
 def run_data_processing():
-    """运行数据处理流程"""
-    processor = DataProcessor()
-    
+    """运行数据处理流程（整轮持锁，并发触发时串行执行）"""
+    with _run_lock:
+        return _run_data_processing()
+
+def _run_data_processing():
+    processor = _get_processor()
+
     # 处理和存储数据
     if processor.process_and_store_data():
         logger.info("数据处理成功")
@@ -110,16 +116,18 @@ def run_data_processing():
         if stats:
             logger.info("=== 数据统计摘要 ===")
             
-            if stats['latest_prices']:
+            # %风格延迟格式化：级别被过滤时完全跳过字符串构建
+            if stats['latest_prices'] and logger.isEnabledFor(logging.INFO):
                 logger.info("最新价格:")
                 for price_data in stats['latest_prices']:
                     name, symbol, price, change_24h, timestamp = price_data
-                    logger.info(f"  {name} ({symbol}): ${float(price):,.2f}, 24h变化: {float(change_24h):.2f}%")
-            
+                    logger.info("  %s (%s): $%.2f, 24h变化: %.2f%%",
+                                name, symbol, float(price), float(change_24h))
+
             logger.info("历史数据统计:")
             for timeframe in ['minute', 'hour', 'day']:
-                count = stats.get(f'{timeframe}_data_count', 0)
-                logger.info(f"  {timeframe}级数据: {count} 条记录")
+                logger.info("  %s级数据: %d 条记录", timeframe,
+                            stats.get(f'{timeframe}_data_count', 0))
         
         return True
     else:
@@ -4,13 +4,59 @@
 避免重复的日志配置，提供项目统一的日志管理
 """
 
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
+import threading
+import time
 from datetime import datetime
 
 # 全局日志配置标志
 _logging_configured = False
 
+# 后台日志监听器（拥有真正的文件/控制台处理器）
+_queue_listener = None
+
+
+class BufferedFileHandler(logging.FileHandler):
+    """带64KB写缓冲的文件处理器
+
+    普通FileHandler每条记录一次write()系统调用，热路径上日志量大时
+    开销可观；这里用大缓冲合并小写入，后台线程每秒强制flush一次，
+    保证缓冲中的记录最多1秒后落盘（即使之后没有新日志到来）。
+    仅用于主日志文件，错误日志保持无缓冲以便崩溃时保留现场。
+    """
+
+    _FLUSH_INTERVAL = 1.0
+
+    def __init__(self, filename, encoding=None):
+        super().__init__(filename, encoding=encoding)
+        flusher = threading.Thread(target=self._flush_loop,
+                                   name='log_flusher', daemon=True)
+        flusher.start()
+
+    def _open(self):
+        return open(self.baseFilename, 'a', buffering=65536, encoding=self.encoding)
+
+    def _flush_loop(self):
+        # Handler.flush自带加锁，与emit并发安全
+        while True:
+            time.sleep(self._FLUSH_INTERVAL)
+            self.flush()
+
+    def emit(self, record):
+        # 与StreamHandler.emit相同，但不在每条记录后flush，
+        # 落盘交给缓冲区阈值和后台定时flush
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            msg = self.format(record)
+            self.stream.write(msg + self.terminator)
+        except Exception:
+            self.handleError(record)
+
 def setup_logging(module_name=None, log_level=logging.INFO):
     """
     设置统一的日志配置
@@ -22,8 +68,8 @@ def setup_logging(module_name=None, log_level=logging.INFO):
     Returns:
         logger: 配置好的logger对象
     """
-    global _logging_configured
-    
+    global _logging_configured, _queue_listener
+
     # 如果已经配置过全局日志，直接返回模块特定的logger
     if _logging_configured:
         return logging.getLogger(module_name or __name__)
@@ -40,32 +86,51 @@ def setup_logging(module_name=None, log_level=logging.INFO):
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
     
-    # 创建格式化器
+    # 创建格式化器（{}风格+validate=False，省去每条记录的格式校验；
+    # 清空毫秒格式，避免多余的字符串拼接）
     formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
+        '{asctime} - {name} - {levelname} - {message}',
+        datefmt='%Y-%m-%d %H:%M:%S',
+        style='{',
+        validate=False
     )
+    formatter.default_msec_format = ''
+
+    # 不采集线程/进程信息，省掉每条记录的查询开销
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
     
     # 控制台处理器
     console_handler = logging.StreamHandler()
     console_handler.setLevel(log_level)
     console_handler.setFormatter(formatter)
-    root_logger.addHandler(console_handler)
-    
-    # 主日志文件处理器
+
+    # 主日志文件处理器（带写缓冲，退出时刷盘）
     main_log_file = os.path.join(logs_dir, 'crypto_system.log')
-    file_handler = logging.FileHandler(main_log_file, encoding='utf-8')
+    file_handler = BufferedFileHandler(main_log_file, encoding='utf-8')
     file_handler.setLevel(log_level)
     file_handler.setFormatter(formatter)
-    root_logger.addHandler(file_handler)
-    
+    atexit.register(file_handler.flush)
+
     # 错误日志文件处理器
     error_log_file = os.path.join(logs_dir, 'crypto_errors.log')
     error_handler = logging.FileHandler(error_log_file, encoding='utf-8')
     error_handler.setLevel(logging.ERROR)
     error_handler.setFormatter(formatter)
-    root_logger.addHandler(error_handler)
-    
+
+    # 日志经无界队列转发给后台监听线程写出：
+    # 热路径上的logger.info只做一次入队，文件I/O不再阻塞调用线程
+    log_queue = queue.Queue(-1)
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    _queue_listener = logging.handlers.QueueListener(
+        log_queue, console_handler, file_handler, error_handler,
+        respect_handler_level=True
+    )
+    _queue_listener.start()
+    atexit.register(_queue_listener.stop)
+
     _logging_configured = True
     
     # 返回模块特定的logger
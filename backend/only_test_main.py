@@ -10,19 +10,22 @@
 - 不参与生产环境的后端服务调用
 """
 
-import signal
+import argparse
+import os
 import sys
 import time
 import threading
-import schedule
-from datetime import datetime
+
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.executors.pool import ThreadPoolExecutor
+from apscheduler.triggers.cron import CronTrigger
 
 # 导入各个模块
-from crypto_scraper import scrape_all_crypto_data as run_data_processing
+from data_processor import run_data_processing
 from crypto_analyzer import run_analysis
-from realtime_processor import run_realtime_processor
-from crypto_web_app import CryptoWebApp
-from crypto_db import CryptoDatabase, rebuild_database
+from realtime_processor import run_realtime_processor_once
+from crypto_web_app import crypto_app
+from crypto_db import rebuild_database
 from kline_processor import run_kline_processing
 from logger_config import get_crypto_logger
 
@@ -33,6 +36,7 @@ class CryptoSystem:
     def __init__(self):
         self.web_app_process = None
         self.is_running = False
+        self.scheduler = None
     
     def initialize_system(self):
         """初始化系统"""
@@ -65,26 +69,37 @@ class CryptoSystem:
     def schedule_tasks(self):
         """设置定时任务"""
         logger.info("设置定时任务")
-        
+
+        # APScheduler后台调度器：按下次触发时间唤醒，任务在线程池并发执行，
+        # 不再需要每隔固定时间轮询run_pending
+        self.scheduler = BackgroundScheduler(
+            executors={'default': ThreadPoolExecutor(max_workers=8)},
+            job_defaults={'coalesce': True, 'max_instances': 1, 'misfire_grace_time': 30}
+        )
+
         # 每5分钟运行一次数据收集
-        schedule.every(5).minutes.do(self.run_data_collection_task)
-        
+        self.scheduler.add_job(self.run_data_collection_task, 'interval',
+                               minutes=5, id='data_collection')
+
         # 每30秒运行一次实时数据处理
-        schedule.every(30).seconds.do(self.run_realtime_task)
-        
+        self.scheduler.add_job(self.run_realtime_task, 'interval',
+                               seconds=30, id='realtime')
+
         # 每小时运行一次分析
-        schedule.every().hour.do(self.run_analysis_task)
-        
+        self.scheduler.add_job(self.run_analysis_task, CronTrigger(minute=0),
+                               id='analysis')
+
         # 每天凌晨2点运行完整处理
-        schedule.every().day.at("02:00").do(self.run_full_processing)
-        
+        self.scheduler.add_job(self.run_full_processing, CronTrigger(hour=2, minute=0),
+                               id='full_processing')
+
         logger.info("定时任务设置完成")
     
     def run_realtime_task(self):
         """运行实时数据处理任务"""
         logger.info("执行实时数据处理任务")
         try:
-            if run_realtime_processor():
+            if run_realtime_processor_once():
                 logger.info("实时数据处理任务完成")
             else:
                 logger.error("实时数据处理任务失败")
@@ -136,31 +151,31 @@ class CryptoSystem:
         """启动Web服务器"""
         logger.info("启动Web服务器")
         try:
-            app.run(debug=False, host='0.0.0.0', port=5000, threaded=True)
+            crypto_app.app.run(debug=False, host='0.0.0.0', port=5000, threaded=True)
         except Exception as e:
             logger.error(f"Web服务器启动失败: {str(e)}")
     
     def run_scheduler(self):
-        """运行调度器"""
+        """运行调度器（阻塞直到停止）"""
         logger.info("启动任务调度器")
         self.is_running = True
-        
-        while self.is_running:
-            try:
-                schedule.run_pending()
-                time.sleep(30)  # 每30秒检查一次
-            except KeyboardInterrupt:
-                logger.info("收到中断信号，正在停止系统...")
-                self.is_running = False
-                break
-            except Exception as e:
-                logger.error(f"调度器运行异常: {str(e)}")
-                time.sleep(60)  # 出错后等待1分钟再继续
-    
+        self.scheduler.start()
+
+        # 调度在后台线程完成，主线程只需等待停止信号
+        try:
+            while self.is_running:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            logger.info("收到中断信号，正在停止系统...")
+        finally:
+            self.stop_system()
+
     def stop_system(self):
         """停止系统"""
         logger.info("正在停止系统...")
         self.is_running = False
+        if self.scheduler and self.scheduler.running:
+            self.scheduler.shutdown(wait=False)
 
 def print_menu():
     """打印菜单"""
@@ -208,10 +223,25 @@ def show_system_status():
     else:
         print("  📈 图表目录: 不存在")
 
-def main():
-    """主函数"""
+def run_full_system(system):
+    """初始化并启动完整系统（定时任务 + Web服务器），阻塞直到中断"""
+    if not system.initialize_system():
+        logger.error("系统初始化失败，无法启动完整系统")
+        return False
+
+    system.schedule_tasks()
+
+    logger.info("系统启动成功，Web服务器: http://localhost:5000")
+    web_thread = threading.Thread(target=system.start_web_server, daemon=True)
+    web_thread.start()
+
+    system.run_scheduler()
+    return True
+
+def interactive_menu():
+    """交互式菜单（仅限TTY调试使用）"""
     system = CryptoSystem()
-    
+
     while True:
         print_menu()
         choice = input("请选择操作 (0-7): ").strip()
@@ -236,7 +266,7 @@ def main():
         
         elif choice == '3':
             print("⚡ 正在运行实时数据处理...")
-            if run_realtime_processor():
+            if run_realtime_processor_once():
                 print("✅ 实时数据处理完成！")
             else:
                 print("❌ 实时数据处理失败！")
@@ -259,31 +289,9 @@ def main():
         
         elif choice == '6':
             print("🚀 正在启动完整系统...")
-            
-            # 初始化系统
-            if not system.initialize_system():
-                print("❌ 系统初始化失败，无法启动完整系统")
-                continue
-            
-            # 设置定时任务
-            system.schedule_tasks()
-            
-            print("✅ 系统启动成功！")
-            print("🌐 Web服务器: http://localhost:5000")
-            print("📊 定时任务已启动")
-            print("⚡ 实时数据处理已启动")
             print("按 Ctrl+C 停止系统")
-            
             try:
-                # 在后台启动Web服务器
-                import threading
-                web_thread = threading.Thread(target=system.start_web_server)
-                web_thread.daemon = True
-                web_thread.start()
-                
-                # 运行调度器
-                system.run_scheduler()
-                
+                run_full_system(system)
             except KeyboardInterrupt:
                 print("\n🛑 正在停止系统...")
                 system.stop_system()
@@ -298,6 +306,41 @@ def main():
         if choice != '0':
             input("\n按回车键继续...")
 
+def main():
+    """命令行入口：用argparse子命令代替交互式菜单，便于脚本化调用"""
+    parser = argparse.ArgumentParser(description='加密货币监控系统测试入口')
+    sub = parser.add_subparsers(dest='cmd')
+    sub.add_parser('init', help='初始化系统（重建数据库）')
+    sub.add_parser('run-data', help='运行一次数据抓取和处理')
+    sub.add_parser('run-realtime', help='运行一次实时数据处理')
+    sub.add_parser('run-analysis', help='生成分析报告')
+    sub.add_parser('serve', help='启动Web服务器')
+    sub.add_parser('full', help='初始化并启动完整系统')
+    sub.add_parser('status', help='查看系统状态')
+    sub.add_parser('menu', help='进入交互式菜单（调试用）')
+    args = parser.parse_args()
+
+    if args.cmd is None or args.cmd == 'menu':
+        interactive_menu()
+        return
+
+    system = CryptoSystem()
+
+    if args.cmd == 'init':
+        sys.exit(0 if system.initialize_system() else 1)
+    elif args.cmd == 'run-data':
+        sys.exit(0 if run_data_processing() else 1)
+    elif args.cmd == 'run-realtime':
+        sys.exit(0 if run_realtime_processor_once() else 1)
+    elif args.cmd == 'run-analysis':
+        sys.exit(0 if run_analysis() else 1)
+    elif args.cmd == 'serve':
+        system.start_web_server()
+    elif args.cmd == 'full':
+        run_full_system(system)
+    elif args.cmd == 'status':
+        show_system_status()
+
 if __name__ == "__main__":
     try:
         main()
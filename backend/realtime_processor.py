@@ -9,11 +9,14 @@ from crypto_db import CryptoDatabase
 from simple_redis_manager import get_cache_manager
 from timestamp_manager import get_timestamp_manager
 from datetime import datetime
-import time
+from concurrent.futures import ThreadPoolExecutor, wait, ALL_COMPLETED
 from logger_config import get_crypto_logger
 
 logger = get_crypto_logger('realtime_processor')
 
+# DB写入与Redis缓存并行用的IO线程池（每轮最多两个任务）
+_io_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='realtime_io')
+
 class RealtimeDataProcessor:
     def __init__(self):
         self.db = CryptoDatabase()
@@ -38,66 +41,51 @@ class RealtimeDataProcessor:
                 logger.warning("没有获取到实时数据")
                 return False
             
-            # 存储实时价格数据到数据库
+            # 本轮处理的统一时间戳，循环内不再重复取当前时间
+            now = self.timestamp_manager.get_current_time()
+
+            # 存储实时价格数据到数据库（质量过滤后一次executemany提交）
             logger.info("开始存储实时价格数据到数据库")
+            good_rows, skipped = [], []
             for data in realtime_data:
-                # 检查数据质量
+                # 检查数据质量，只存储质量分数大于0.5的数据
                 quality_score = self.timestamp_manager.get_data_quality_score(data['timestamp'], 'minute')
-                self.timestamp_manager.log_data_status(data['timestamp'], 'minute')
-                
-                # 只存储质量分数大于0.5的数据
                 if quality_score >= 0.5:
-                    success = self.db.insert_current_price(
-                        symbol=data['symbol'],
-                        price=data['price'],
-                        change_24h=data['change_24h'],
-                        timestamp=data['timestamp']
-                    )
-                    
-                    if success:
-                        logger.info(f"实时数据存储成功: {data['symbol']} - ${data['price']:,.2f} (质量分数: {quality_score:.2f})")
-                    else:
-                        logger.error(f"实时数据存储失败: {data['symbol']}")
+                    good_rows.append((data['symbol'], data['price'],
+                                      data['change_24h'], data['timestamp']))
                 else:
-                    logger.warning(f"数据质量过低，跳过存储: {data['symbol']} (质量分数: {quality_score:.2f})")
-            
-            # 缓存实时数据到Redis
-            logger.info("开始缓存实时数据到Redis")
-            
-            # 准备可序列化的缓存数据
-            cache_ready_data = []
-            for data in realtime_data:
-                cache_item = {
-                    'name': data['name'],
-                    'symbol': data['symbol'],
-                    'price': data['price'],
-                    'change_24h': data['change_24h'],
-                    'timestamp': data['timestamp'].isoformat(),
-                    'cached_at': self.timestamp_manager.get_current_time().isoformat()
-                }
-                cache_ready_data.append(cache_item)
-            
-            # 缓存整体实时价格列表
-            if self.cache_manager.cache_realtime_prices(cache_ready_data):
-                logger.info("实时价格列表缓存成功")
-            else:
-                logger.warning("实时价格列表缓存失败")
-            
-            # 缓存单个币种的实时数据
+                    skipped.append(data['symbol'])
+
+            if skipped:
+                logger.warning("数据质量过低，跳过存储: %s", ', '.join(skipped))
+
+            # 缓存实时数据到Redis：orjson可直接序列化datetime，
+            # 不再为了转isoformat重建一份字典
             for data in realtime_data:
-                cache_data = {
-                    'symbol': data['symbol'],
-                    'name': data['name'],
-                    'price': data['price'],
-                    'change_24h': data['change_24h'],
-                    'timestamp': data['timestamp'].isoformat(),
-                    'cached_at': self.timestamp_manager.get_current_time().isoformat()
-                }
-                
-                if self.cache_manager.cache_realtime_price(data['symbol'], cache_data):
-                    logger.info(f"实时数据缓存成功: {data['symbol']}")
+                data['cached_at'] = now
+
+            # DB写入与Redis缓存互相独立且都是网络IO，
+            # 并行执行后单轮耗时约等于两者中较慢的一方
+            db_future = None
+            if good_rows:
+                db_future = _io_executor.submit(
+                    self.db.insert_current_prices_batch, good_rows)
+            cache_future = _io_executor.submit(
+                self.cache_manager.cache_realtime_bulk, realtime_data)
+
+            wait([f for f in (db_future, cache_future) if f],
+                 return_when=ALL_COMPLETED)
+
+            if db_future:
+                if db_future.result():
+                    logger.info("实时数据存储完成: %d/%d 条", len(good_rows), len(realtime_data))
                 else:
-                    logger.warning(f"实时数据缓存失败: {data['symbol']}")
+                    logger.error("实时数据批量存储失败")
+
+            if cache_future.result():
+                logger.info("实时数据缓存完成: %d 条", len(realtime_data))
+            else:
+                logger.warning("实时数据批量缓存失败")
             
             logger.info("实时数据处理和存储完成")
             return True
@@ -105,8 +93,7 @@ class RealtimeDataProcessor:
         except Exception as e:
             logger.error(f"实时数据处理过程中发生错误: {str(e)}")
             return False
-        finally:
-            self.db.disconnect()
+        # 连接保持存活，30秒后的下一轮直接复用
     
     def get_realtime_data_from_cache(self):
         """从缓存获取实时数据"""
@@ -115,7 +102,7 @@ class RealtimeDataProcessor:
         # 尝试获取实时价格列表
         cached_data = self.cache_manager.get_realtime_prices()
         if cached_data:
-            logger.info(f"从缓存获取到实时数据: {len(cached_data)} 条")
+            logger.info("从缓存获取到实时数据: %d 条", len(cached_data))
             return cached_data
         
         logger.info("缓存中没有实时数据")
@@ -132,7 +119,7 @@ class RealtimeDataProcessor:
         try:
             data = self.db.get_latest_prices()
             if data:
-                logger.info(f"从数据库获取到实时数据: {len(data)} 条")
+                logger.info("从数据库获取到实时数据: %d 条", len(data))
                 return data
             else:
                 logger.info("数据库中没有实时数据")
@@ -140,8 +127,6 @@ class RealtimeDataProcessor:
         except Exception as e:
             logger.error(f"从数据库获取实时数据失败: {str(e)}")
             return None
-        finally:
-            self.db.disconnect()
     
     def get_realtime_data(self, limit=10):
         """获取实时数据（优先从缓存，然后从数据库）"""
@@ -171,10 +156,19 @@ class RealtimeDataProcessor:
         
         return None
 
+# 模块级单例：30秒一轮的tick复用同一个处理器（及其数据库连接池）
+_processor = None
+
+def _get_processor():
+    global _processor
+    if _processor is None:
+        _processor = RealtimeDataProcessor()
+    return _processor
+
 def run_realtime_processor_once():
     """运行一次实时数据处理（供调度器调用）"""
-    processor = RealtimeDataProcessor()
-    
+    processor = _get_processor()
+
     try:
         logger.info("=" * 50)
         logger.info("开始新一轮实时数据处理")
@@ -193,34 +187,6 @@ def run_realtime_processor_once():
         logger.error(f"实时数据处理器发生未预期错误: {str(e)}")
         return False
 
-def run_realtime_processor():
-    """运行实时数据处理器（无限循环模式）"""
-    processor = RealtimeDataProcessor()
-    
-    while True:
-        try:
-            logger.info("=" * 50)
-            logger.info("开始新一轮实时数据处理")
-            
-            # 处理和存储实时数据
-            success = processor.process_and_store_realtime_data()
-            
-            if success:
-                logger.info("实时数据处理成功")
-            else:
-                logger.error("实时数据处理失败")
-            
-            # 等待30秒后进行下一轮处理
-            logger.info("等待30秒后进行下一轮处理...")
-            time.sleep(30)
-            
-        except KeyboardInterrupt:
-            logger.info("收到中断信号，停止实时数据处理")
-            break
-        except Exception as e:
-            logger.error(f"实时数据处理器发生未预期错误: {str(e)}")
-            time.sleep(10)  # 发生错误时等待10秒
-
 if __name__ == "__main__":
     logger.info("启动实时数据处理器")
-    run_realtime_processor()
\ No newline at end of file
+    run_realtime_processor_once()
\ No newline at end of file
@@ -4,10 +4,11 @@
 只使用基础Redis功能，不依赖集群库
 """
 
-import json
+import orjson
 import time
 import hashlib
 import os
+import zlib
 from typing import Any, Optional, Dict
 from datetime import datetime, timedelta
 from logger_config import get_crypto_logger
@@ -20,6 +21,7 @@ class SimpleRedisManager:
     def __init__(self, host=None, port=None, db=None, password=None):
         """初始化Redis连接"""
         self.redis_client = None
+        self.raw_client = None
         self.host = host or os.getenv('REDIS_HOST', 'localhost')
         self.port = int(port or os.getenv('REDIS_PORT', 6379))
         self.db = int(db or os.getenv('REDIS_DB', 0))
@@ -44,15 +46,20 @@ class SimpleRedisManager:
                 redis_config['password'] = self.password
                 
             self.redis_client = redis.Redis(**redis_config)
+            # 二进制客户端：存取压缩后的预序列化字节，不做字符串解码
+            raw_config = dict(redis_config, decode_responses=False)
+            self.raw_client = redis.Redis(**raw_config)
             # 测试连接
             self.redis_client.ping()
             logger.info(f"✅ Redis连接成功: {self.host}:{self.port}")
         except ImportError:
             logger.error("❌ Redis库未安装，请运行: sudo apt install python3-redis")
             self.redis_client = None
+            self.raw_client = None
         except Exception as e:
             logger.error(f"❌ Redis连接失败: {e}")
             self.redis_client = None
+            self.raw_client = None
     
     def is_connected(self) -> bool:
         """检查Redis连接状态"""
@@ -70,9 +77,10 @@ class SimpleRedisManager:
             return False
         
         try:
-            # 序列化数据
+            # 序列化数据（orjson比标准库快数倍，且原生支持datetime）
             if isinstance(value, (dict, list)):
-                serialized_value = json.dumps(value, ensure_ascii=False)
+                serialized_value = orjson.dumps(
+                    value, option=orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY)
             else:
                 serialized_value = str(value)
             
@@ -99,13 +107,39 @@ class SimpleRedisManager:
             
             # 尝试反序列化JSON
             try:
-                return json.loads(value)
-            except json.JSONDecodeError:
+                return orjson.loads(value)
+            except orjson.JSONDecodeError:
                 return value
         except Exception as e:
             logger.error(f"获取缓存失败 {key}: {e}")
             return None
     
+    def set_raw(self, key: str, value: bytes, expire: Optional[int] = None) -> bool:
+        """存储二进制值（预序列化/压缩后的字节）"""
+        if not self.is_connected() or not self.raw_client:
+            return False
+
+        try:
+            if expire:
+                result = self.raw_client.setex(key, expire, value)
+            else:
+                result = self.raw_client.set(key, value)
+            return bool(result)
+        except Exception as e:
+            logger.error(f"设置二进制缓存失败 {key}: {e}")
+            return False
+
+    def get_raw(self, key: str) -> Optional[bytes]:
+        """获取二进制值"""
+        if not self.is_connected() or not self.raw_client:
+            return None
+
+        try:
+            return self.raw_client.get(key)
+        except Exception as e:
+            logger.error(f"获取二进制缓存失败 {key}: {e}")
+            return None
+
     def delete(self, *keys: str) -> int:
         """删除缓存"""
         if not self.is_connected():
@@ -157,6 +191,18 @@ class CryptoCacheManager:
         self.redis = SimpleRedisManager(host=host, port=port, db=db, password=password)
         self.default_expire = 30  # 30秒默认过期时间，提高数据实时性
     
+    def get_json(self, key: str) -> Optional[Any]:
+        """获取任意JSON缓存负载"""
+        return self.redis.get(key)
+
+    def set_json(self, key: str, value: Any, ttl: int = None) -> bool:
+        """缓存任意JSON负载"""
+        return self.redis.set(key, value, ttl or self.default_expire)
+
+    def delete(self, *keys: str) -> int:
+        """删除指定缓存键（用于写入后主动失效）"""
+        return self.redis.delete(*keys)
+
     def cache_price(self, symbol: str, price_data: Dict) -> bool:
         """缓存价格数据"""
         key = f"crypto:price:{symbol.upper()}"
@@ -167,6 +213,26 @@ class CryptoCacheManager:
         key = f"crypto:price:{symbol.upper()}"
         return self.redis.get(key)
     
+    def get_prices_mget(self, symbols: list) -> Dict[str, Optional[Dict]]:
+        """一次MGET批量获取多个币种的价格数据（单次网络往返）"""
+        result = {symbol: None for symbol in symbols}
+        if not self.redis.is_connected():
+            return result
+
+        try:
+            keys = [f"crypto:price:{symbol.upper()}" for symbol in symbols]
+            values = self.redis.redis_client.mget(keys)
+            for symbol, value in zip(symbols, values):
+                if value is not None:
+                    try:
+                        result[symbol] = orjson.loads(value)
+                    except orjson.JSONDecodeError:
+                        result[symbol] = value
+            return result
+        except Exception as e:
+            logger.error(f"批量获取价格失败: {e}")
+            return result
+
     def cache_chart_data(self, symbol: str, timeframe: str, data: list) -> bool:
         """缓存图表数据"""
         key = f"crypto:chart:{symbol.upper()}:{timeframe}"
@@ -178,6 +244,23 @@ class CryptoCacheManager:
         key = f"crypto:chart:{symbol.upper()}:{timeframe}"
         return self.redis.get(key)
     
+    def cache_chart_data_raw(self, symbol: str, timeframe: str, json_bytes: bytes) -> bool:
+        """缓存已序列化的图表响应字节（zlib压缩，命中时无需重新编码JSON）"""
+        key = f"crypto:chart:raw:{symbol.upper()}:{timeframe}"
+        return self.redis.set_raw(key, zlib.compress(json_bytes, 3), 120)  # 与图表缓存同为2分钟
+
+    def get_chart_data_raw(self, symbol: str, timeframe: str) -> Optional[bytes]:
+        """获取预序列化的图表响应字节（解压后可直接作为响应体）"""
+        key = f"crypto:chart:raw:{symbol.upper()}:{timeframe}"
+        blob = self.redis.get_raw(key)
+        if blob is None:
+            return None
+        try:
+            return zlib.decompress(blob)
+        except zlib.error as e:
+            logger.warning(f"解压图表缓存失败 {key}: {e}")
+            return None
+
     def cache_latest_prices(self, prices: list) -> bool:
         """缓存最新价格列表"""
         key = "crypto:latest_prices"
@@ -197,6 +280,29 @@ class CryptoCacheManager:
         """获取实时价格列表"""
         key = "crypto:realtime_prices"
         return self.redis.get(key)
+
+    def cache_realtime_bulk(self, items: list) -> bool:
+        """单次pipeline往返缓存实时价格列表和各币种数据
+
+        逐个SET每个币种外加整体列表需要 N+1 次网络往返，
+        这里用非事务pipeline把所有命令打包成一次send/recv。
+        """
+        if not self.redis.is_connected():
+            return False
+
+        try:
+            with self.redis.redis_client.pipeline(transaction=False) as pipe:
+                opt = orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY
+                for item in items:
+                    key = f"crypto:realtime:{item['symbol'].upper()}"
+                    pipe.setex(key, 30, orjson.dumps(item, option=opt))
+                pipe.setex("crypto:realtime_prices", 30,
+                           orjson.dumps(items, option=opt))
+                pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"批量缓存实时数据失败: {e}")
+            return False
     
     def clear_all_cache(self) -> bool:
         """清理所有加密货币相关缓存"""
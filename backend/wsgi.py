@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+生产环境WSGI入口
+
+使用Gunicorn启动:
+
+    gunicorn -w 4 -k gthread --threads 8 --timeout 60 wsgi:app
+
+注意不要加--preload：导入本模块会立即建立MySQL连接池和Redis连接，
+预加载后这些socket会在fork时被所有worker共享，mysql-connector的
+连接池并非fork安全，并发worker会互相破坏连接协议。
+每个worker独立导入、各建各的连接池即可。
+
+后台调度器默认不随worker启动，避免每个worker都跑一份定时任务；
+需要调度器时设置 ENABLE_SCHEDULER=1 并只给一个实例
+（k8s中部署为独立的单副本Deployment）。
+"""
+
+import os
+
+from crypto_web_app import crypto_app
+
+app = crypto_app.app
+
+# 仅显式开启时启动调度器，保证多worker部署只有一个调度器实例
+if os.getenv('ENABLE_SCHEDULER') == '1':
+    crypto_app.start_background_scheduler()